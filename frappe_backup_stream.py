@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+
+import requests
+
+CHUNK_SIZE = 4 * 1024 * 1024
+WORKERS = 4
+RETRIES = 5
+TIMEOUT = 30
+
+_local = threading.local()
+
+def _session():
+    """Return a per-thread requests session"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+def auth_headers(api_credentials):
+    """Build the Frappe token auth header from 'api_key:api_secret'"""
+    if api_credentials and ':' in api_credentials:
+        return {"Authorization": f"token {api_credentials.strip()}"}
+    return {}
+
+def fetch_latest_backups(website_url, headers=None):
+    """Ask the source site for the download URLs of its latest backups"""
+    resp = _session().get(
+        f"{website_url}/api/method/frappe.utils.backups.fetch_latest_backups",
+        headers=headers, timeout=TIMEOUT
+    )
+    resp.raise_for_status()
+    backups = {}
+    for kind, path in (resp.json().get("message") or {}).items():
+        if path:
+            backups[kind] = f"{website_url}/backups/{os.path.basename(path)}"
+    return backups
+
+def fetch_site_config(url, headers=None):
+    """Download the small site_config backup as a dict"""
+    resp = _session().get(url, headers=headers, timeout=TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()
+
+def probe(url, headers=None):
+    """Return (size, supports_ranges) for a remote file, or (0, False) if HEAD is refused"""
+    resp = _session().head(url, headers=headers, allow_redirects=True, timeout=TIMEOUT)
+    if not resp.ok:
+        # Let the plain streamed GET report any real error
+        return 0, False
+    size = int(resp.headers.get("Content-Length") or 0)
+    ranged = resp.headers.get("Accept-Ranges", "").lower() == "bytes" and size > 0
+    return size, ranged
+
+def check_reachable(url, headers=None):
+    """Raise if the remote file cannot be downloaded, reading at most its first byte"""
+    with _session().get(url, headers=dict(headers or {}, Range="bytes=0-0"),
+                        stream=True, timeout=TIMEOUT) as resp:
+        resp.raise_for_status()
+
+def fetch_range(url, start, end, headers=None, retries=RETRIES):
+    """Download bytes start..end (inclusive), resuming from the last byte received on failure"""
+    expected = end - start + 1
+    buf = bytearray()
+    attempt = 0
+    while True:
+        offset = start + len(buf)
+        try:
+            range_headers = dict(headers or {}, Range=f"bytes={offset}-{end}")
+            with _session().get(url, headers=range_headers, stream=True, timeout=TIMEOUT) as resp:
+                if resp.status_code != 206:
+                    raise requests.HTTPError(f"Expected 206 for range {offset}-{end}, got {resp.status_code}")
+                for data in resp.iter_content(64 * 1024):
+                    buf.extend(data)
+                    if len(buf) > expected:
+                        # Not retried: asking again would only request a range past the end
+                        raise requests.HTTPError(f"Server sent more than range {start}-{end}")
+            if len(buf) < expected:
+                raise requests.ConnectionError(f"Short read for range {start}-{end}: {len(buf)} bytes")
+            return bytes(buf)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+            attempt += 1
+            if attempt > retries:
+                raise
+            time.sleep(min(2 ** attempt, 30) * 0.1)
+
+def iter_download(url, headers=None, chunk_size=CHUNK_SIZE, workers=WORKERS, progress=None):
+    """Yield the remote file in order while fetching ranged chunks in parallel"""
+    size, ranged = probe(url, headers)
+    meter = _Throughput(size, progress)
+    if not ranged:
+        with _session().get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+            resp.raise_for_status()
+            for data in resp.iter_content(chunk_size):
+                meter.update(len(data))
+                yield data
+        meter.done()
+        return
+
+    ranges = deque((start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size))
+    # Keep a bounded window of chunks in flight so memory stays at window * chunk_size
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < window:
+                    start, end = ranges.popleft()
+                    pending.append(pool.submit(fetch_range, url, start, end, headers))
+                data = pending.popleft().result()
+                meter.update(len(data))
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+    meter.done()
+
+def decompress(chunks, name):
+    """Gunzip a chunk stream on the fly when the backup is compressed"""
+    if not name.endswith((".gz", ".tgz")):
+        yield from chunks
+        return
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        for data in chunks:
+            out = inflater.decompress(data)
+            if out:
+                yield out
+    finally:
+        _close(chunks)
+    tail = inflater.flush()
+    if tail:
+        yield tail
+    if not inflater.eof:
+        raise EOFError(f"Compressed stream ended early: {name}")
+
+def pipe_to_command(chunks, cmd, cwd=None):
+    """Feed a chunk stream to a command's stdin and raise if it fails"""
+    with tempfile.TemporaryFile() as output:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=output,
+                                   stderr=subprocess.STDOUT, cwd=cwd)
+        broken_pipe = None
+        try:
+            try:
+                for data in chunks:
+                    process.stdin.write(data)
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+        except BrokenPipeError as e:
+            broken_pipe = e
+            # Stop the download now instead of when the generator is garbage collected
+            _close(chunks)
+        except BaseException:
+            _close(chunks)
+            process.kill()
+            process.wait()
+            raise
+        return_code = process.wait()
+        if return_code != 0:
+            output.seek(0)
+            raise subprocess.CalledProcessError(return_code, cmd,
+                                                output.read().decode(errors="replace"))
+        if broken_pipe:
+            # The command stopped reading before the stream ended, so the restore is partial
+            raise broken_pipe
+
+def restore_database(url, bench_path, site_name, headers=None, progress=None, **kwargs):
+    """Stream a database backup straight into the site's MariaDB console"""
+    chunks = decompress(iter_download(url, headers, progress=progress, **kwargs), url)
+    pipe_to_command(chunks, ["bench", "--site", site_name, "mariadb"], cwd=bench_path)
+
+def restore_files(url, bench_path, site_name, headers=None, progress=None, **kwargs):
+    """Stream a public or private files backup straight into tar at the site root"""
+    site_path = os.path.join(bench_path, "sites", site_name)
+    os.makedirs(site_path, exist_ok=True)
+    chunks = decompress(iter_download(url, headers, progress=progress, **kwargs), url)
+    # Entries look like './<site>/public/files/...'; like bench restore, strip './<site>' at the site root
+    pipe_to_command(chunks, ["tar", "xf", "-", "--strip-components", "2"], cwd=site_path)
+
+def _close(chunks):
+    """Close a chunk generator so any download feeding it stops"""
+    close = getattr(chunks, "close", None)
+    if close:
+        close()
+
+class _Throughput:
+    """Report downloaded bytes and rate at most once per second"""
+
+    def __init__(self, total, progress):
+        self.total = total
+        self.progress = progress
+        self.received = 0
+        self.started = self.last = time.monotonic()
+
+    def update(self, count):
+        self.received += count
+        now = time.monotonic()
+        if self.progress and now - self.last >= 1:
+            self.last = now
+            self.progress(self.message(now))
+
+    def done(self):
+        if self.progress:
+            self.progress(self.message(time.monotonic()))
+
+    def message(self, now):
+        mb = self.received / (1024 * 1024)
+        rate = mb / max(now - self.started, 1e-6)
+        if self.total:
+            return f"Downloaded {mb:.1f}/{self.total / (1024 * 1024):.1f} MB ({rate:.1f} MB/s)"
+        return f"Downloaded {mb:.1f} MB ({rate:.1f} MB/s)"
@@ -11,6 +11,7 @@ from pathlib import Path
 import getpass
 import requests
 import json
+import frappe_backup_stream
 
 class FrappeSetupGUI:
     def __init__(self, root):
@@ -193,13 +194,23 @@ class FrappeSetupGUI:
             if github_repos:
                 self.update_progress("Installing custom apps from GitHub...")
                 self.install_custom_apps(bench_path, github_repos, site_name)
+            self.progress_bar['value'] = 85
+
+            # Import data from website once all apps are in place
+            data_imported = False
+            if website_url:
+                self.update_progress("Importing data from website...")
+                data_imported = self.import_website_data(bench_path, site_name, website_url, website_username)
             self.progress_bar['value'] = 90
-            
+
             # Setup complete
             self.update_progress("\n=== Setup Completed Successfully! ===")
             self.update_progress(f"✓ Bench directory: {bench_path}")
             self.update_progress(f"✓ Site URL: http://{site_name}:8000")
-            self.update_progress(f"✓ Admin password: {admin_password}")
+            if data_imported:
+                self.update_progress("✓ Administrator login now matches the source website")
+            else:
+                self.update_progress(f"✓ Admin password: {admin_password}")
             self.update_progress("\nTo start the bench, run:")
             self.update_progress(f"cd {bench_path}")
             self.update_progress("bench start")
@@ -443,6 +454,56 @@ class FrappeSetupGUI:
             if os.path.exists(temp_dir):
                 shutil.rmtree(temp_dir)
 
+    def import_website_data(self, bench_path, site_name, website_url, api_credentials):
+        """Stream the website's latest database and files backups straight into the local site.
+        Returns True once the source data has been restored, False if the import was skipped."""
+        headers = frappe_backup_stream.auth_headers(api_credentials)
+        if not headers:
+            self.update_progress("No API key:secret given, skipping data import from website")
+            return False
+        if not website_url.startswith(('http://', 'https://')):
+            website_url = 'http://' + website_url
+        website_url = website_url.rstrip('/')
+
+        # Nothing has touched the local site yet, so failures here only skip the import
+        try:
+            self.update_progress("Fetching latest backups from website...")
+            backups = frappe_backup_stream.fetch_latest_backups(website_url, headers)
+            if backups.get("database"):
+                frappe_backup_stream.check_reachable(backups["database"], headers)
+        except (requests.RequestException, ValueError) as e:
+            self.update_progress(f"Warning: Could not fetch backups from website, skipping data import: {e}")
+            return False
+        if not backups.get("database"):
+            self.update_progress("No database backup found on website, skipping data import")
+            return False
+
+        try:
+            os.chdir(bench_path)
+            self.update_progress("Restoring database from website backup...")
+            frappe_backup_stream.restore_database(backups["database"], bench_path, site_name,
+                                                  headers=headers, progress=self.update_progress)
+            for kind in ("public", "private"):
+                if backups.get(kind):
+                    self.update_progress(f"Restoring {kind} files from website backup...")
+                    frappe_backup_stream.restore_files(backups[kind], bench_path, site_name,
+                                                       headers=headers, progress=self.update_progress)
+
+            # Encrypted fields in the restored data only decrypt with the source site's key
+            if backups.get("config"):
+                config = frappe_backup_stream.fetch_site_config(backups["config"], headers)
+                if config.get("encryption_key"):
+                    self.run_command([
+                        "bench", "--site", site_name, "set-config", "encryption_key", config["encryption_key"]
+                    ])
+
+            self.run_command(["bench", "--site", site_name, "migrate"])
+            self.update_progress("Website data imported successfully")
+            return True
+        except (requests.RequestException, subprocess.CalledProcessError, OSError, EOFError) as e:
+            self.update_progress(f"Failed to import website data: {e}")
+            raise
+
     def prompt_for_repo_url(self, app_name):
         import tkinter.simpledialog
         repo_url = tkinter.simpledialog.askstring(
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import subprocess
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import frappe_backup_stream
+
+# Random values keep the gzipped dump well above one 64 KiB read, so drops land mid-chunk
+SQL = b"".join(b"INSERT INTO `tabNote` VALUES ('%s');\n" % os.urandom(16).hex().encode() for _ in range(20000))
+FILE_DATA = b"hello from the source site\n"
+
+def make_files_backup():
+    """Build a gzipped files backup the way Frappe does, from ./<site>/public/files"""
+    with tempfile.TemporaryDirectory() as sites_path:
+        files_path = os.path.join(sites_path, "source.site", "public", "files")
+        os.makedirs(files_path)
+        with open(os.path.join(files_path, "a.txt"), "wb") as f:
+            f.write(FILE_DATA)
+        return subprocess.check_output(["tar", "czf", "-", "./source.site/public/files"], cwd=sites_path)
+
+BACKUPS = {
+    "/backups/x-database.sql.gz": gzip.compress(SQL),
+    "/backups/x-files.tgz": make_files_backup(),
+}
+
+class BackupHandler(BaseHTTPRequestHandler):
+    """Stand-in for a Frappe site serving its backups"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        if self.server.head_status:
+            self.send_response(self.server.head_status)
+            self.end_headers()
+            return
+        self.send_body(head=True)
+
+    def do_GET(self):
+        self.send_body(head=False)
+
+    def send_body(self, head):
+        body = BACKUPS.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        byte_range = self.headers.get("Range")
+        if byte_range and self.server.ranged:
+            start, end = (int(n) for n in byte_range.split("=")[1].split("-"))
+            part = body[start:end + 1 + self.server.extra_bytes]
+            self.server.range_starts.append(start)
+            self.send_response(206)
+            self.send_header("Content-Length", str(len(part)))
+            self.end_headers()
+            if self.server.drops and len(part) > 1:
+                # Cut the connection halfway through the chunk
+                self.server.drops -= 1
+                self.wfile.write(part[:len(part) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(part)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.ranged:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+class BackupStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), BackupHandler)
+        self.server.ranged = True
+        self.server.drops = 0
+        self.server.head_status = None
+        self.server.extra_bytes = 0
+        self.server.range_starts = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, path):
+        return self.base_url + path
+
+    def test_fetch_range_resumes_after_dropped_connection(self):
+        self.server.drops = 3
+        body = BACKUPS["/backups/x-database.sql.gz"]
+        end = len(body) - 1
+        data = frappe_backup_stream.fetch_range(self.url("/backups/x-database.sql.gz"), 0, end)
+        self.assertEqual(data, body)
+        self.assertEqual(self.server.drops, 0)
+        # Each retry asks only for the bytes not yet received
+        self.assertEqual(len(self.server.range_starts), 4)
+        self.assertEqual(self.server.range_starts[0], 0)
+        self.assertTrue(all(start > 0 for start in self.server.range_starts[1:]))
+
+    def test_ranged_download_with_drops(self):
+        self.server.drops = 3
+        url = self.url("/backups/x-database.sql.gz")
+        data = b"".join(frappe_backup_stream.iter_download(url, chunk_size=4096, workers=3))
+        self.assertEqual(data, BACKUPS["/backups/x-database.sql.gz"])
+        self.assertEqual(self.server.drops, 0)
+
+    def test_fetch_range_rejects_overlong_response(self):
+        self.server.extra_bytes = 10
+        with self.assertRaises(frappe_backup_stream.requests.HTTPError):
+            frappe_backup_stream.fetch_range(self.url("/backups/x-database.sql.gz"), 0, 99)
+        # Not retried with a range past the end
+        self.assertEqual(self.server.range_starts, [0])
+
+    def test_check_reachable(self):
+        frappe_backup_stream.check_reachable(self.url("/backups/x-database.sql.gz"))
+        with self.assertRaises(frappe_backup_stream.requests.HTTPError):
+            frappe_backup_stream.check_reachable(self.url("/backups/missing.sql.gz"))
+
+    def test_progress_reports_throughput(self):
+        messages = []
+        url = self.url("/backups/x-database.sql.gz")
+        b"".join(frappe_backup_stream.iter_download(url, chunk_size=4096, progress=messages.append))
+        total = len(BACKUPS["/backups/x-database.sql.gz"]) / (1024 * 1024)
+        self.assertRegex(messages[-1], rf"^Downloaded {total:.1f}/{total:.1f} MB \([0-9.]+ MB/s\)$")
+
+    def test_download_without_range_support(self):
+        self.server.ranged = False
+        url = self.url("/backups/x-database.sql.gz")
+        self.assertEqual(frappe_backup_stream.probe(url), (len(BACKUPS["/backups/x-database.sql.gz"]), False))
+        data = b"".join(frappe_backup_stream.iter_download(url, chunk_size=4096))
+        self.assertEqual(data, BACKUPS["/backups/x-database.sql.gz"])
+        self.assertEqual(self.server.range_starts, [])
+
+    def test_refused_head_falls_back_to_get(self):
+        self.server.head_status = 405
+        url = self.url("/backups/x-database.sql.gz")
+        self.assertEqual(frappe_backup_stream.probe(url), (0, False))
+        data = b"".join(frappe_backup_stream.iter_download(url))
+        self.assertEqual(data, BACKUPS["/backups/x-database.sql.gz"])
+
+    def test_decompress(self):
+        body = BACKUPS["/backups/x-database.sql.gz"]
+        chunks = [body[i:i + 1000] for i in range(0, len(body), 1000)]
+        self.assertEqual(b"".join(frappe_backup_stream.decompress(chunks, "x-database.sql.gz")), SQL)
+        self.assertEqual(list(frappe_backup_stream.decompress([b"plain"], "x-files.tar")), [b"plain"])
+
+    def test_decompress_truncated(self):
+        body = BACKUPS["/backups/x-database.sql.gz"]
+        with self.assertRaises(EOFError):
+            b"".join(frappe_backup_stream.decompress([body[:len(body) // 2]], "x-database.sql.gz"))
+
+    def test_restore_files(self):
+        with tempfile.TemporaryDirectory() as bench_path:
+            frappe_backup_stream.restore_files(self.url("/backups/x-files.tgz"), bench_path, "s")
+            site_path = os.path.join(bench_path, "sites", "s")
+            with open(os.path.join(site_path, "public", "files", "a.txt"), "rb") as f:
+                self.assertEqual(f.read(), FILE_DATA)
+            self.assertFalse(os.path.exists(os.path.join(site_path, "public", "public")))
+
+    def test_pipe_to_command_failure(self):
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            frappe_backup_stream.pipe_to_command([b"data"], ["sh", "-c", "cat > /dev/null; echo boom; exit 3"])
+        self.assertEqual(cm.exception.returncode, 3)
+        self.assertIn("boom", cm.exception.output)
+
+    def test_pipe_to_command_early_exit(self):
+        closed = []
+
+        def chunks():
+            try:
+                for _ in range(256):
+                    yield b"x" * 65536
+            finally:
+                closed.append(True)
+
+        with self.assertRaises(BrokenPipeError):
+            frappe_backup_stream.pipe_to_command(chunks(), ["sh", "-c", "exit 0"])
+        self.assertEqual(closed, [True])
+
+if __name__ == "__main__":
+    unittest.main()